@@ -55,3 +55,4 @@ def new_handle(self: Any) -> CData: ...
 def from_handle(cdata: CData) -> Any: ...
 def cast(new_type: str, cdata: CData, /) -> CData: ...
 def addressof(cdata: _CDataT) -> _CDataT: ...
+def sizeof(cdecl: str | CData) -> int: ...
@@ -23,6 +23,10 @@ dispatcher_func: DispatcherFuncT
 resource_destroy_func: ResourceDestroyFuncT
 notify_func: NotifyFuncT
 
+# wl_fixed_t handling
+def wl_fixed_to_double(f: int) -> float: ...
+def wl_fixed_from_double(d: float) -> int: ...
+def wl_fixed_from_int(i: int) -> int: ...
 def wl_list_remove(list: ListCData) -> None: ...
 
 # Event loop functionality
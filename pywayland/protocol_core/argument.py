@@ -31,6 +31,20 @@ class classproperty:
         return self.f(owner)
 
 
+# Signature character for each argument type, untyped new ids are sent as the
+# interface name and version followed by the new id
+_SIGNATURES = {
+    ArgumentType.Int: "i",
+    ArgumentType.Uint: "u",
+    ArgumentType.Fixed: "f",
+    ArgumentType.String: "s",
+    ArgumentType.Object: "o",
+    ArgumentType.NewId: "n",
+    ArgumentType.Array: "a",
+    ArgumentType.FileDescriptor: "h",
+}
+
+
 @dataclass(frozen=True)
 class Argument:
     argument_type: ArgumentType
@@ -39,25 +53,9 @@ class Argument:
 
     @property
     def signature(self) -> str:
-        if self.argument_type == ArgumentType.Int:
-            base_signature = "i"
-        elif self.argument_type == ArgumentType.Uint:
-            base_signature = "u"
-        elif self.argument_type == ArgumentType.Fixed:
-            base_signature = "f"
-        elif self.argument_type == ArgumentType.String:
-            base_signature = "s"
-        elif self.argument_type == ArgumentType.Object:
-            base_signature = "o"
-        elif self.argument_type == ArgumentType.NewId:
-            if self.interface is None:
-                base_signature = "sun"
-            else:
-                base_signature = "n"
-        elif self.argument_type == ArgumentType.Array:
-            base_signature = "a"
-        elif self.argument_type == ArgumentType.FileDescriptor:
-            base_signature = "h"
+        base_signature = _SIGNATURES[self.argument_type]
+        if self.argument_type == ArgumentType.NewId and self.interface is None:
+            base_signature = "su" + base_signature
 
         if self.nullable:
             return "?" + base_signature
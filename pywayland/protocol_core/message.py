@@ -14,7 +14,9 @@
 
 from __future__ import annotations
 
-from typing import Callable, Iterable
+import contextlib
+import threading
+from typing import Callable, Iterable, Iterator
 from weakref import WeakKeyDictionary
 
 from pywayland import ffi, lib
@@ -22,6 +24,192 @@ from .argument import Argument, ArgumentType
 
 weakkeydict: WeakKeyDictionary = WeakKeyDictionary()
 
+_WL_ARRAY_SIZE = ffi.sizeof("struct wl_array")
+
+# An untyped new id is preceded by the interface name and version, arguments
+# are immutable so these can be shared by every message
+_UNTYPED_NEW_ID_ARGUMENTS = (Argument(ArgumentType.String), Argument(ArgumentType.Uint))
+
+# Looked up once, rather than on every converted argument
+_NULL = ffi.NULL
+_fixed_to_double = lib.wl_fixed_to_double
+_fixed_from_double = lib.wl_fixed_from_double
+_fixed_from_int = lib.wl_fixed_from_int
+
+# C strings shared between all messages with the same name or signature
+_cstring_cache: dict[bytes, ffi.CDataArray] = {}
+
+
+def _cstring(value: str) -> ffi.CDataArray:
+    """Get the shared, never freed, C string for the given value"""
+    encoded = value.encode()
+    cdata = _cstring_cache.get(encoded)
+    if cdata is None:
+        cdata = _cstring_cache[encoded] = ffi.new("char[]", encoded)
+    return cdata
+
+
+# Interface arrays shared between all messages with the same argument types
+_types_cache: dict[tuple, ffi.CDataArray] = {}
+
+
+def _types_array(arguments: tuple[Argument, ...]) -> ffi.CDataArray:
+    """Get the shared, never freed, wl_interface array for the arguments"""
+    key = tuple(argument.interface for argument in arguments)
+    types = _types_cache.get(key)
+    if types is None:
+        types = _types_cache[key] = ffi.new("struct wl_interface* []", len(key))
+        for index, interface in enumerate(key):
+            if interface is None:
+                types[index] = ffi.NULL
+            else:
+                assert interface._ptr is not None
+                types[index] = interface._ptr
+    return types
+
+
+# Converters from a `wl_argument` to a Python object, keyed by argument type
+def _c_to_int(message, argument, arg_ptr):
+    return arg_ptr.i
+
+
+def _c_to_uint(message, argument, arg_ptr):
+    return arg_ptr.u
+
+
+def _c_to_fixed(message, argument, arg_ptr):
+    return _fixed_to_double(arg_ptr.f)
+
+
+def _c_to_fd(message, argument, arg_ptr):
+    return arg_ptr.h
+
+
+def _c_to_string(message, argument, arg_ptr):
+    if arg_ptr.s == _NULL:
+        if not argument.nullable:
+            raise RuntimeError(
+                "Got null string parsing arguments for '{}' message".format(
+                    message.name
+                )
+            )
+        return None
+    return ffi.string(arg_ptr.s).decode()
+
+
+def _c_to_object(message, argument, arg_ptr):
+    if arg_ptr.o == _NULL:
+        if not argument.nullable:
+            raise RuntimeError(
+                "Got null object parsing arguments for '{}' message, may already be destroyed".format(
+                    message.name
+                )
+            )
+        return None
+
+    iface = argument.interface
+    proxy_ptr = ffi.cast("struct wl_proxy *", arg_ptr.o)
+    obj = iface.registry.get(proxy_ptr)
+    if obj is None:
+        raise RuntimeError(
+            "Unable to get object for {}, was it garbage collected?".format(proxy_ptr)
+        )
+    return obj
+
+
+def _c_to_new_id(message, argument, arg_ptr):
+    # Incoming new ids would need a Python proxy or resource to be created for
+    # the new object, which requires the display or client that received the
+    # message, and that is not available when converting arguments
+    raise NotImplementedError(
+        "Unable to convert new id argument of '{}' message".format(message.name)
+    )
+
+
+def _c_to_array(message, argument, arg_ptr):
+    array_ptr = arg_ptr.a
+    return ffi.buffer(array_ptr.data, array_ptr.size)[:]
+
+
+class _NullArgumentError(Exception):
+    """Raised by the converters below when given None for a non-nullable
+    argument, and reported with the argument's position by the caller"""
+
+
+# Converters from a Python object into a `wl_argument`, keyed by argument type,
+# any cdata that must outlive the call is appended to `refs`, these take the
+# same leading arguments as the converters above
+def _int_to_c(message, argument, arg_ptr, arg, refs):
+    arg_ptr.i = arg
+
+
+def _uint_to_c(message, argument, arg_ptr, arg, refs):
+    arg_ptr.u = arg
+
+
+def _fixed_to_c(message, argument, arg_ptr, arg, refs):
+    if isinstance(arg, int):
+        arg_ptr.f = _fixed_from_int(arg)
+    else:
+        arg_ptr.f = _fixed_from_double(arg)
+
+
+def _fd_to_c(message, argument, arg_ptr, arg, refs):
+    arg_ptr.h = arg
+
+
+def _string_to_c(message, argument, arg_ptr, arg, refs):
+    if arg is None:
+        if not argument.nullable:
+            raise _NullArgumentError
+        new_arg = _NULL
+    else:
+        new_arg = ffi.new("char []", arg.encode())
+        refs.append(new_arg)
+    arg_ptr.s = new_arg
+
+
+def _object_to_c(message, argument, arg_ptr, arg, refs):
+    if arg is None:
+        if not argument.nullable:
+            raise _NullArgumentError
+        new_arg = _NULL
+    else:
+        # A cast does not own any memory, the object itself is kept alive by
+        # the caller while it is being marshaled
+        new_arg = ffi.cast("struct wl_object *", arg._ptr)
+    arg_ptr.o = new_arg
+
+
+def _array_to_c(message, argument, arg_ptr, arg, refs):
+    # The scratch arrays give each array argument a wl_array to reuse, other
+    # arrays are zeroed and need one to be allocated
+    new_arg = arg_ptr.a
+    if isinstance(arg, (bytes, bytearray, memoryview)):
+        # Point directly into the caller's buffer rather than copying it, the
+        # buffer is exported, so it cannot be resized, until `refs` is dropped
+        new_data = ffi.from_buffer(arg)
+        size = ffi.sizeof(new_data)
+        refs.append(new_data)
+        if new_arg == _NULL:
+            new_arg = ffi.new("struct wl_array *")
+            refs.append(new_arg)
+    else:
+        # Copy anything else, allocating any wl_array that is needed in the
+        # same block, ahead of its data
+        size = memoryview(arg).nbytes
+        if new_arg == _NULL:
+            block = ffi.new("char []", _WL_ARRAY_SIZE + size)
+            new_arg = ffi.cast("struct wl_array *", block)
+            new_data = block + _WL_ARRAY_SIZE
+        else:
+            block = new_data = ffi.new("char []", size)
+        ffi.buffer(new_data, size)[:] = arg
+        refs.append(block)
+    new_arg.alloc = new_arg.size = size
+    new_arg.data = new_data
+    arg_ptr.a = new_arg
+
 
 class Message:
     """Wrapper class for `wl_message` structs
@@ -45,6 +233,40 @@ class Message:
         `list`
     """
 
+    __slots__ = (
+        "py_func",
+        "name",
+        "arguments",
+        "version",
+        "_c_arguments",
+        "_nargs",
+        "_decoders",
+        "_encoders",
+        "_n_inputs",
+        "_scratch",
+    )
+
+    _C_TO_ARG = {
+        ArgumentType.Int: _c_to_int,
+        ArgumentType.Uint: _c_to_uint,
+        ArgumentType.Fixed: _c_to_fixed,
+        ArgumentType.FileDescriptor: _c_to_fd,
+        ArgumentType.String: _c_to_string,
+        ArgumentType.Object: _c_to_object,
+        ArgumentType.NewId: _c_to_new_id,
+        ArgumentType.Array: _c_to_array,
+    }
+
+    _ARG_TO_C = {
+        ArgumentType.Int: _int_to_c,
+        ArgumentType.Uint: _uint_to_c,
+        ArgumentType.Fixed: _fixed_to_c,
+        ArgumentType.FileDescriptor: _fd_to_c,
+        ArgumentType.String: _string_to_c,
+        ArgumentType.Object: _object_to_c,
+        ArgumentType.Array: _array_to_c,
+    }
+
     def __init__(
         self, func: Callable, arguments: list[Argument], version: int | None
     ) -> None:
@@ -54,12 +276,38 @@ class Message:
         self.arguments = arguments
         self.version = version
 
+        # The arguments are fixed once the message is created, so flatten the
+        # marshaled arguments here rather than on every marshaling call
+        self._c_arguments = tuple(self._marshaled_arguments)
+        self._nargs = len(self._c_arguments)
+
+        # Resolve the converter for each argument up front, new ids have no
+        # entry in `_ARG_TO_C` as they are filled in by libwayland
+        self._decoders = tuple(
+            (self._C_TO_ARG[argument.argument_type], argument)
+            for argument in self.arguments
+        )
+        # Each encoder is paired with the index of its input argument
+        encoders: list[tuple[Callable | None, Argument, int]] = []
+        n_inputs = 0
+        for argument in self._c_arguments:
+            encode = self._ARG_TO_C.get(argument.argument_type)
+            if encode is None:
+                encoders.append((None, argument, -1))
+            else:
+                encoders.append((encode, argument, n_inputs))
+                n_inputs += 1
+        self._encoders = tuple(encoders)
+        self._n_inputs = n_inputs
+
+        # Per-thread `wl_argument` arrays, created when first marshaled
+        self._scratch: threading.local | None = None
+
     @property
     def _marshaled_arguments(self) -> Iterable[Argument]:
         for arg in self.arguments:
             if arg.interface is None and arg.argument_type == ArgumentType.NewId:
-                yield Argument(ArgumentType.String)
-                yield Argument(ArgumentType.Uint)
+                yield from _UNTYPED_NEW_ID_ARGUMENTS
             yield arg
 
     def build_message_struct(self, wl_message_struct) -> tuple:
@@ -75,21 +323,10 @@ class Message:
         if self.version is not None:
             signature = f"{self.version}{signature}"
 
-        wl_message_struct.name = name = ffi.new("char[]", self.name.encode())
-        wl_message_struct.signature = cdata_signature = ffi.new(
-            "char[]", signature.encode()
-        )
+        wl_message_struct.name = name = _cstring(self.name)
+        wl_message_struct.signature = cdata_signature = _cstring(signature)
 
-        wl_message_struct.types = types = ffi.new(
-            "struct wl_interface* []", len(list(self._marshaled_arguments))
-        )
-
-        for index, argument in enumerate(self._marshaled_arguments):
-            if argument.interface is None:
-                types[index] = ffi.NULL
-            else:
-                assert argument.interface._ptr is not None
-                types[index] = argument.interface._ptr
+        wl_message_struct.types = types = _types_array(self._c_arguments)
 
         return name, cdata_signature, types
 
@@ -104,56 +341,10 @@ class Message:
         :type args_ptr: cdata `union wl_argument []`
         :returns: list of args
         """
-        args = []
-        for i, argument in enumerate(self.arguments):
-            arg_ptr = args_ptr[i]
-
-            # Match numbers (int, unsigned, float, file descriptor)
-            if argument.argument_type == ArgumentType.Int:
-                args.append(arg_ptr.i)
-            elif argument.argument_type == ArgumentType.Uint:
-                args.append(arg_ptr.u)
-            elif argument.argument_type == ArgumentType.Fixed:
-                f = lib.wl_fixed_to_double(arg_ptr.f)
-                args.append(f)
-            elif argument.argument_type == ArgumentType.FileDescriptor:
-                args.append(arg_ptr.h)
-            elif argument.argument_type == ArgumentType.String:
-                if arg_ptr == ffi.NULL:
-                    if not argument.nullable:
-                        raise Exception
-                    args.append(None)
-                else:
-                    args.append(ffi.string(arg_ptr.s).decode())
-            elif argument.argument_type == ArgumentType.Object:
-                if arg_ptr.o == ffi.NULL:
-                    if not argument.nullable:
-                        message = "Got null object parsing arguments for '{}' message, may already be destroyed".format(
-                            self.name
-                        )
-                        raise RuntimeError(message)
-                    args.append(None)
-                else:
-                    iface = argument.interface
-                    proxy_ptr = ffi.cast("struct wl_proxy *", arg_ptr.o)
-                    obj = iface.registry.get(proxy_ptr)
-                    if obj is None:
-                        raise RuntimeError(
-                            "Unable to get object for {}, was it garbage collected?".format(
-                                proxy_ptr
-                            )
-                        )
-                    args.append(obj)
-            elif argument.argument_type == ArgumentType.NewId:
-                # TODO
-                raise NotImplementedError
-            elif argument.argument_type == ArgumentType.Array:
-                array_ptr = arg_ptr.a
-                args.append(ffi.buffer(array_ptr.data, array_ptr.size)[:])
-            else:
-                raise Exception(f"Bad argument: {argument}")
-
-        return args
+        return [
+            decode(self, argument, args_ptr[i])
+            for i, (decode, argument) in enumerate(self._decoders)
+        ]
 
     def arguments_to_c(self, *args):
         """Create an array of `wl_argument` C structs
@@ -161,64 +352,110 @@ class Message:
         Generate the CFFI cdata array of `wl_argument` structs that correspond
         to the arguments of the method as specified by the method signature.
 
+        Array arguments given as `bytes`, `bytearray` or `memoryview` are
+        referenced rather than copied, so they must not be modified while the
+        returned array is in use.
+
         :param args: Input arguments
         :type args: `list`
         :returns: cdata `union wl_argument []` of args
         """
-        nargs = len(list(self._marshaled_arguments))
-        args_ptr = ffi.new("union wl_argument []", nargs)
-
-        arg_iter = iter(args)
         refs = []
-        for i, argument in enumerate(self._marshaled_arguments):
-            # New id (set to null for now, will be assigned on marshal)
-            # Then, continue so we don't consume an arg
-            if argument.argument_type == ArgumentType.NewId:
-                args_ptr[i].o = ffi.NULL
-                continue
-
-            arg = next(arg_iter)
-            # Match numbers (int, unsigned, float, file descriptor)
-            if argument.argument_type == ArgumentType.Int:
-                args_ptr[i].i = arg
-            elif argument.argument_type == ArgumentType.Uint:
-                args_ptr[i].u = arg
-            elif argument.argument_type == ArgumentType.Fixed:
-                if isinstance(arg, int):
-                    f = lib.wl_fixed_from_int(arg)
-                else:
-                    f = lib.wl_fixed_from_double(arg)
-                args_ptr[i].f = f
-            elif argument.argument_type == ArgumentType.FileDescriptor:
-                args_ptr[i].h = arg
-            elif argument.argument_type == ArgumentType.String:
-                if arg is None:
-                    if not argument.nullable:
-                        raise Exception
-                    new_arg = ffi.NULL
-                else:
-                    new_arg = ffi.new("char []", arg.encode())
-                    refs.append(new_arg)
-                args_ptr[i].s = new_arg
-            elif argument.argument_type == ArgumentType.Object:
-                if arg is None:
-                    if not argument.nullable:
-                        raise Exception
-                    new_arg = ffi.NULL
-                else:
-                    new_arg = ffi.cast("struct wl_object *", arg._ptr)
-                    refs.append(new_arg)
-                args_ptr[i].o = new_arg
-            elif argument.argument_type == ArgumentType.Array:
-                # TODO: this is a bit messy, we probably don't want to put everything in one buffer like this
-                new_arg = ffi.new("struct wl_array *")
-                new_data = ffi.new("void []", len(arg))
-                new_arg.alloc = new_arg.size = len(arg)
-                ffi.buffer(new_data)[:] = arg
-                refs.append(new_arg)
-                refs.append(new_data)
+        args_ptr = ffi.new("union wl_argument []", self._nargs)
+        self.arguments_to_c_into(args_ptr, refs, *args)
 
         if len(refs) > 0:
             weakkeydict[args_ptr] = tuple(refs)
 
         return args_ptr
+
+    def scratch_arguments(self):
+        """Get the reusable array of `wl_argument` C structs for this thread
+
+        The array is shared by every call on the same thread, so it must be
+        consumed, e.g. by marshaling it, before the message is used again.  It
+        is returned with the thread's list for the cdata it references, to be
+        filled with :meth:`arguments_to_c_into` and cleared once the array has
+        been consumed.
+
+        :returns: cdata `union wl_argument []` sized for the message and the
+            `list` of its references
+        """
+        scratch = self._scratch
+        if scratch is None:
+            scratch = self._scratch = threading.local()
+        args_ptr = getattr(scratch, "args_ptr", None)
+        if args_ptr is None:
+            args_ptr = scratch.args_ptr = ffi.new("union wl_argument []", self._nargs)
+            scratch.refs = []
+
+            # Give each array argument a wl_array to reuse on every call
+            array_indices = [
+                index
+                for index, (_, argument, _) in enumerate(self._encoders)
+                if argument.argument_type == ArgumentType.Array
+            ]
+            if array_indices:
+                arrays = scratch.arrays = ffi.new(
+                    "struct wl_array []", len(array_indices)
+                )
+                for array_index, index in enumerate(array_indices):
+                    args_ptr[index].a = arrays + array_index
+        return args_ptr, scratch.refs
+
+    @contextlib.contextmanager
+    def marshaled_arguments(self, *args) -> Iterator:
+        """Fill the reusable array of `wl_argument` C structs for this thread
+
+        Context manager giving the array returned by :meth:`scratch_arguments`
+        filled with the given arguments.  The array is only valid, and the
+        cdata objects it references are only kept alive, within the `with`
+        block, which should contain the call that marshals it.
+
+        :param args: Input arguments
+        :type args: `list`
+        """
+        args_ptr, refs = self.scratch_arguments()
+        try:
+            self.arguments_to_c_into(args_ptr, refs, *args)
+            yield args_ptr
+        finally:
+            # Release the references but keep the list for the next call
+            refs.clear()
+
+    def arguments_to_c_into(self, args_ptr, refs, *args) -> None:
+        """Fill a caller-owned array of `wl_argument` C structs
+
+        Populate the given array with the arguments of the method, as in
+        :meth:`arguments_to_c`.  Any cdata objects referenced by the array are
+        appended to `refs`, which the caller must keep alive for as long as the
+        array is in use.  Array arguments are written into the `wl_array` the
+        argument already points to, so `args_ptr` must either be zeroed or come
+        from :meth:`scratch_arguments`.
+
+        :param args_ptr: Array to fill, with room for every marshaled argument
+        :type args_ptr: cdata `union wl_argument []`
+        :param refs: List which receives the cdata referenced by `args_ptr`
+        :type refs: `list`
+        :param args: Input arguments
+        :type args: `list`
+        """
+        if len(args) != self._n_inputs:
+            raise TypeError(
+                f"'{self.name}' takes {self._n_inputs} arguments, got {len(args)}"
+            )
+
+        try:
+            for i, (encode, argument, slot) in enumerate(self._encoders):
+                # New id (set to null for now, will be assigned on marshal)
+                if encode is None:
+                    args_ptr[i].o = _NULL
+                    continue
+
+                encode(self, argument, args_ptr[i], args[slot], refs)
+        except _NullArgumentError:
+            raise TypeError(
+                "Argument {} of '{}' message is a non-nullable {} and may not be None".format(
+                    slot, self.name, argument.argument_type.name
+                )
+            ) from None
@@ -97,24 +97,23 @@ class Proxy(Generic[T]):
     @ensure_valid
     def _marshal(self, opcode, *args) -> None:
         """Marshal the given arguments into the Wayland wire format"""
-        # Create a wl_argument array
-        args_ptr = self.interface.requests[opcode].arguments_to_c(*args)
-
-        # Write the event into the connection queue
         proxy = ffi.cast("struct wl_proxy *", self._ptr)
-        lib.wl_proxy_marshal_array(proxy, opcode, args_ptr)
+
+        # Create a wl_argument array and write the event into the connection queue
+        with self.interface.requests[opcode].marshaled_arguments(*args) as args_ptr:
+            lib.wl_proxy_marshal_array(proxy, opcode, args_ptr)
 
     def _marshal_constructor(
         self, opcode: int, interface: Type[InterfaceT], *args
     ) -> Proxy[InterfaceT]:
         """Marshal the given arguments into the Wayland wire format for a constructor"""
-        # Create a wl_argument array
-        args_ptr = self.interface.requests[opcode].arguments_to_c(*args)
-
-        # Write the event into the connection queue and build a new proxy from the given args
         proxy = ffi.cast("struct wl_proxy *", self._ptr)
-        proxy_ptr = lib.wl_proxy_marshal_array_constructor(
-            proxy, opcode, args_ptr, interface._ptr
-        )
+
+        # Create a wl_argument array, write the event into the connection queue
+        # and build a new proxy from the given args
+        with self.interface.requests[opcode].marshaled_arguments(*args) as args_ptr:
+            proxy_ptr = lib.wl_proxy_marshal_array_constructor(
+                proxy, opcode, args_ptr, interface._ptr
+            )
 
         return interface.proxy_class(proxy_ptr, self._display)
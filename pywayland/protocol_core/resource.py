@@ -93,13 +93,13 @@ class Resource(Generic[T]):
 
     @ensure_valid
     def _post_event(self, opcode, *args) -> None:
-        # Create wl_argument array
-        args_ptr = self.interface.events[opcode].arguments_to_c(*args)
         # Make the cast to a wl_resource
         assert self._ptr is not None
         resource: ffi.ResourceCData = ffi.cast("struct wl_resource *", self._ptr)  # type: ignore[assignment]
 
-        lib.wl_resource_post_event_array(resource, opcode, args_ptr)
+        # Create wl_argument array
+        with self.interface.events[opcode].marshaled_arguments(*args) as args_ptr:
+            lib.wl_resource_post_event_array(resource, opcode, args_ptr)
 
     @ensure_valid
     def _post_error(self, code, msg="") -> None:
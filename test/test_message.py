@@ -0,0 +1,259 @@
+# Copyright 2022 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+import threading
+
+import pytest
+
+from pywayland import ffi
+from pywayland.protocol_core import Argument, ArgumentType, Interface
+from pywayland.protocol_core.message import Message
+
+
+def _func(self, *args):
+    pass
+
+
+def test_message_arguments():
+    message = Message(
+        _func,
+        [
+            Argument(ArgumentType.Int),
+            Argument(ArgumentType.Uint),
+            Argument(ArgumentType.Fixed),
+            Argument(ArgumentType.String),
+            Argument(ArgumentType.FileDescriptor),
+        ],
+        None,
+    )
+
+    args_ptr = message.arguments_to_c(-1, 2, 3.5, "four", 5)
+    assert message.c_to_arguments(args_ptr) == [-1, 2, 3.5, "four", 5]
+
+
+def test_message_scratch_arguments():
+    message = Message(
+        _func, [Argument(ArgumentType.String), Argument(ArgumentType.Uint)], None
+    )
+    # The scratch arrays are only created once the message is marshaled
+    assert message._scratch is None
+
+    with message.marshaled_arguments("first", 1) as args_ptr:
+        assert message.c_to_arguments(args_ptr) == ["first", 1]
+        scratch_ptr, refs = message.scratch_arguments()
+        assert scratch_ptr is args_ptr
+        assert len(refs) == 1
+
+    # The references are released, the list is kept for the next call
+    assert refs == []
+    assert message.scratch_arguments()[1] is refs
+
+    # The same array is reused on each call from a thread
+    with message.marshaled_arguments("second", 2) as second_ptr:
+        assert second_ptr is args_ptr
+        assert message.c_to_arguments(args_ptr) == ["second", 2]
+
+    thread_args = []
+    thread = threading.Thread(
+        target=lambda: thread_args.extend(message.scratch_arguments())
+    )
+    thread.start()
+    thread.join()
+    assert thread_args[0] is not args_ptr
+
+
+class _Core(Interface):
+    name = "core"
+    version = 1
+
+
+_Core._gen_c()
+
+
+class _Object:
+    def __init__(self):
+        self._data = ffi.new("char []", 8)
+        self._ptr = ffi.cast("struct wl_proxy *", self._data)
+        _Core.registry[self._ptr] = self
+
+
+def test_message_object():
+    message = Message(
+        _func,
+        [
+            Argument(ArgumentType.Object, interface=_Core),
+            Argument(ArgumentType.Object, nullable=True, interface=_Core),
+        ],
+        None,
+    )
+
+    obj = _Object()
+    args_ptr = message.arguments_to_c(obj, None)
+    assert message.c_to_arguments(args_ptr) == [obj, None]
+
+
+class _Other(Interface):
+    name = "other"
+    version = 1
+
+
+def _build_message_struct(message):
+    wl_message = ffi.new("struct wl_message *")
+    keep_alive = message.build_message_struct(wl_message)
+    return wl_message, keep_alive
+
+
+def test_message_struct_strings():
+    message = Message(
+        _func, [Argument(ArgumentType.Uint), Argument(ArgumentType.NewId)], 2
+    )
+    first, _ = _build_message_struct(message)
+    second, _ = _build_message_struct(
+        Message(_func, [Argument(ArgumentType.Uint)], None)
+    )
+
+    # Since-versioned messages are prefixed, untyped new ids expand to "sun"
+    assert ffi.string(first.signature) == b"2usun"
+    assert ffi.string(second.signature) == b"u"
+
+    # Equal names share one C string
+    assert first.name == second.name
+    assert ffi.string(first.name) == b"func"
+
+
+def test_message_struct_types():
+    typed = Message(_func, [Argument(ArgumentType.NewId, interface=_Core)], None)
+    untyped = Message(_func, [Argument(ArgumentType.NewId)], None)
+    first, _ = _build_message_struct(typed)
+    second, _ = _build_message_struct(
+        Message(_func, [Argument(ArgumentType.Object, interface=_Core)], None)
+    )
+    other, _ = _build_message_struct(
+        Message(_func, [Argument(ArgumentType.Object, interface=_Other)], None)
+    )
+    new_id, _ = _build_message_struct(untyped)
+
+    # Messages with the same interfaces share one types array
+    assert first.types == second.types
+    assert first.types != other.types
+    assert first.types != new_id.types
+
+    assert first.types[0] == _Core._ptr
+    assert other.types[0] == _Other._ptr
+    assert [new_id.types[i] for i in range(3)] == [ffi.NULL] * 3
+
+
+def test_message_fixed():
+    message = Message(_func, [Argument(ArgumentType.Fixed)], None)
+
+    # Integers and floats are converted with separate wl_fixed helpers
+    assert message.c_to_arguments(message.arguments_to_c(3)) == [3.0]
+    assert message.c_to_arguments(message.arguments_to_c(-0.25)) == [-0.25]
+
+
+def test_message_new_id_unsupported():
+    message = Message(_func, [Argument(ArgumentType.NewId, interface=_Core)], None)
+
+    args_ptr = message.arguments_to_c()
+    with pytest.raises(NotImplementedError, match="'func' message"):
+        message.c_to_arguments(args_ptr)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x01\x02\x03",
+        bytearray(b"\x04\x05"),
+        memoryview(b"\x06"),
+        array.array("B", [7, 8]),
+        array.array("I", [9, 10]),
+        memoryview(array.array("I", [11])),
+    ],
+)
+def test_message_array(data):
+    message = Message(
+        _func, [Argument(ArgumentType.Uint), Argument(ArgumentType.Array)], None
+    )
+
+    args_ptr = message.arguments_to_c(10, data)
+    assert message.c_to_arguments(args_ptr) == [10, bytes(data)]
+
+
+def test_message_new_id():
+    message = Message(
+        _func,
+        [Argument(ArgumentType.Uint), Argument(ArgumentType.NewId)],
+        None,
+    )
+
+    # An untyped new id is marshaled as the interface name and version
+    args_ptr = message.arguments_to_c(1, "wl_core", 2)
+    assert args_ptr[0].u == 1
+    assert ffi.string(args_ptr[1].s) == b"wl_core"
+    assert args_ptr[2].u == 2
+    assert args_ptr[3].o == ffi.NULL
+
+    with pytest.raises(TypeError):
+        message.arguments_to_c(1, "wl_core")
+
+
+def test_message_nullable():
+    message = Message(
+        _func,
+        [Argument(ArgumentType.String, nullable=True), Argument(ArgumentType.String)],
+        None,
+    )
+
+    args_ptr = message.arguments_to_c(None, "text")
+    assert message.c_to_arguments(args_ptr) == [None, "text"]
+
+    with pytest.raises(TypeError, match="Argument 1 of 'func' message"):
+        message.arguments_to_c("text", None)
+
+    # Untyped new ids share their argument descriptions
+    message = Message(
+        _func, [Argument(ArgumentType.NewId), Argument(ArgumentType.NewId)], None
+    )
+    with pytest.raises(TypeError, match="Argument 2 of 'func' message"):
+        message.arguments_to_c("text", 1, None, 2)
+
+
+def test_message_array_released():
+    message = Message(_func, [Argument(ArgumentType.Array)], None)
+    data = bytearray(b"\x01\x02")
+
+    with message.marshaled_arguments(data) as args_ptr:
+        assert message.c_to_arguments(args_ptr) == [b"\x01\x02"]
+        with pytest.raises(BufferError):
+            data.extend(b"\x03")
+
+    # Once marshaled the buffer is no longer exported
+    data.extend(b"\x03")
+    assert data == b"\x01\x02\x03"
+
+
+def test_message_array_scratch():
+    message = Message(
+        _func, [Argument(ArgumentType.Uint), Argument(ArgumentType.Array)], None
+    )
+
+    # Each call from a thread fills the same wl_array
+    with message.marshaled_arguments(1, b"\x01\x02") as args_ptr:
+        array_ptr = args_ptr[1].a
+        assert message.c_to_arguments(args_ptr) == [1, b"\x01\x02"]
+
+    with message.marshaled_arguments(2, array.array("B", [3])) as args_ptr:
+        assert args_ptr[1].a == array_ptr
+        assert message.c_to_arguments(args_ptr) == [2, b"\x03"]